@@ -1,24 +1,44 @@
 import typing as T
 import datetime
-import requests
-from bs4 import BeautifulSoup
+from pathlib import Path
+import time
+from concurrent import futures
+from urllib.parse import urlparse
+
+# imported before Prefect, so PROFILE_STARTUP also times the Prefect import
+from webscraper_utils import LatencyTracker, CircuitBreaker, backoff_delays, profile_startup
+
 from prefect import task, Flow, Parameter, unmapped
 from prefect.engine import cache_validators
 from prefect.engine.result_handlers import LocalResultHandler
-from prefect.environments.storage import Docker
 from prefect.schedules import Schedule
 from prefect.schedules.clocks import CronClock
-import sqlalchemy as sa
+from prefect.utilities.logging import get_logger
+
+# requests, bs4 and sqlalchemy are only imported within the tasks which need them, so defining the Flow stays cheap
+if T.TYPE_CHECKING:
+    import requests
+    import sqlalchemy as sa
+
+
+#============================
+# Tail latency
+#============================
+# retrieve_url derives its timeout from the observed latency, and hedges requests slower than the p95 latency
+latency_tracker = LatencyTracker()
+circuit_breaker = CircuitBreaker()
 
 
 @task(
     name="Create DB",
     tags=['db']
 )
-def create_db(filename: T.Union[str, Parameter]) -> sa.Table:
+def create_db(filename: T.Union[str, Parameter]) -> 'sa.Table':
     """
     Specify the Schema of the output table
     """
+    import sqlalchemy as sa
+
     meta = sa.MetaData(
         bind=sa.create_engine(f"sqlite:///{filename}")
     )
@@ -43,7 +63,7 @@ def create_db(filename: T.Union[str, Parameter]) -> sa.Table:
 
 
 @task
-def insert_episode(episode: T.Tuple, tbl: sa.Table):
+def insert_episode(episode: T.Tuple, tbl: 'sa.Table'):
     """
     Insert the data into the Database
     """
@@ -64,6 +84,7 @@ def create_episode_list(base_url, main_html, bypass):
     """
     Given the main page html, creates a list of episode URLs
     """
+    from bs4 import BeautifulSoup
 
     if bypass:
         return [base_url]
@@ -86,17 +107,78 @@ def create_episode_list(base_url, main_html, bypass):
     # cache_validator=cache_validators.all_inputs,
     tags=["web"]
 )
-def retrieve_url(url):
+def retrieve_url(url, retries=3):
     """
     Given a URL (string), retrieves html and
     returns the html as a string.
     """
+    import requests
+
+    host = urlparse(url).netloc
+    for attempt, delay in enumerate(backoff_delays(retries=retries)):
+        if attempt:
+            time.sleep(delay)
+        try:
+            html = hedged_get(url)
+        except (requests.RequestException, ) as ex:
+            get_logger().warning(f'{url} failed with {ex!r} on attempt {attempt + 1} of {retries}')
+            circuit_breaker.failure(host)
+        else:
+            if html.ok:
+                circuit_breaker.success(host)
+                return html.text
+            if html.status_code < 500 and html.status_code != 429:
+                # the host is healthy, the page just isn't there
+                circuit_breaker.success(host)
+                break
+            circuit_breaker.failure(host)
+
+    raise ValueError("{} could not be retrieved.".format(url))
+
+
+def timed_get(url: str, timeout: float, stage: str) -> 'requests.Response':
+    import requests
+
+    start = time.monotonic()
+    try:
+        response = requests.get(url, timeout=timeout)
+    except (requests.Timeout, ) as ex:
+        latency_tracker.record(stage, timeout)
+        raise ex
+    latency_tracker.record(stage, time.monotonic() - start)
+    return response
+
+
+def hedged_get(url: str, stage: str = 'retrieve_url') -> 'requests.Response':
+    """
+    GET the url, issuing a duplicate request when the first hasn't answered within the p95 latency
+    of the stage (within the hedge budget of the tracker), and return whichever answers first
+    """
+    import requests
+
+    circuit_breaker.wait(urlparse(url).netloc)
+    timeout = latency_tracker.timeout(stage)
+    hedge_delay = latency_tracker.hedge_delay(stage)
 
-    html = requests.get(url)
-    if html.ok:
-        return html.text
-    else:
-        raise ValueError("{} could not be retrieved.".format(url))
+    pool = futures.ThreadPoolExecutor(max_workers=2)
+    try:
+        pending = [pool.submit(timed_get, url, timeout, stage)]
+        if hedge_delay is not None:
+            done, _ = futures.wait(pending, timeout=hedge_delay)
+            if not done and latency_tracker.claim_hedge(stage):
+                get_logger().info(f'{url} slower than p95 of {hedge_delay:.2f} seconds, hedging request')
+                pending.append(pool.submit(timed_get, url, timeout, stage))
+
+        error = None
+        for future in futures.as_completed(pending):
+            try:
+                return future.result()
+            except (requests.RequestException, ) as ex:
+                error = ex
+        raise error
+    finally:
+        # don't wait on the straggler, it's bounded by its own timeout
+        pool.shutdown(wait=False)
 
 
 @task
@@ -106,6 +188,7 @@ def scrape_dialogue(episode_html):
     returns a tuple of (title, [(character, text)]) of the
     dialogue from that episode
     """
+    from bs4 import BeautifulSoup
 
     episode = BeautifulSoup(episode_html, 'html.parser')
 
@@ -119,6 +202,33 @@ def scrape_dialogue(episode_html):
     return (title, dialogue)
 
 
+def configure_deployment(flow: Flow) -> Flow:
+    """
+    Attach the storage, which is only needed to register the Flow on Prefect Cloud
+    """
+    from prefect.environments.storage import Docker
+
+    flow.storage = Docker(
+        # TODO: change to your docker registry:
+        #  https://docs.prefect.io/cloud/recipes/configuring_storage.html
+        registry_url='szelenka',
+        # TODO: 'pin' the exact versions you used on your development machine
+        python_dependencies=[
+            'requests==2.23.0',
+            'beautifulsoup4==4.8.2',
+            'sqlalchemy==1.3.15'
+        ],
+        # ship the helpers shared by the example Flows
+        files={
+            Path(__file__).with_name('webscraper_utils.py').absolute().as_posix(): '/modules/webscraper_utils.py'
+        },
+        env_vars={
+            'PYTHONPATH': '$PYTHONPATH:/modules/'
+        },
+    )
+    return flow
+
+
 with Flow(
         name="xfiles",
         schedule=Schedule(
@@ -133,17 +243,6 @@ with Flow(
                 ),
             ]
         ),
-        storage=Docker(
-            # TODO: change to your docker registry:
-            #  https://docs.prefect.io/cloud/recipes/configuring_storage.html
-            registry_url='szelenka',
-            # TODO: 'pin' the exact versions you used on your development machine
-            python_dependencies=[
-                'requests==2.23.0',
-                'beautifulsoup4==4.8.2',
-                'sqlalchemy==1.3.15'
-            ],
-        ),
         # TODO: specify how you want to handle results
         #  https://docs.prefect.io/core/concepts/results.html#results-and-result-handlers
         result_handler=LocalResultHandler()
@@ -171,6 +270,10 @@ with Flow(
         tbl=unmapped(_db)
     )
 
+# report the time to the first task, when PROFILE_STARTUP is set
+for _task in flow.tasks:
+    _task.state_handlers.append(profile_startup)
+
 
 if __name__ == '__main__':
     # debug the local execution of the flow
@@ -193,7 +296,7 @@ if __name__ == '__main__':
         if p.deploy:
             # TODO: hack for https://github.com/PrefectHQ/prefect/issues/2165
             flow.result_handler.dir = '/root/.prefect/results'
-            flow.register(
+            configure_deployment(flow).register(
                 # TODO: specify the project_name on Prefect Cloud you're authenticated to
                 project_name="Sample Project Name",
                 build=True,
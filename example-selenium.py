@@ -1,67 +1,158 @@
 import typing as T
 import datetime
 from pathlib import Path
+import atexit
+import collections
+import contextlib
+import os
+import signal
 import tempfile
+import threading
 import time
+import types
 import random
 import re
-import sqlalchemy as sa
+from urllib.parse import urlparse
+
+# imported before Prefect, so PROFILE_STARTUP also times the Prefect import
+from webscraper_utils import RuntimeStateMixin, LatencyTracker, CircuitBreaker, backoff_delays, profile_startup
 
 from prefect import task, Flow, Parameter, unmapped
 from prefect.engine.result import Result
 from prefect.schedules import Schedule
 from prefect.schedules.clocks import CronClock
 from prefect.engine import cache_validators
-from prefect.environments import KubernetesJobEnvironment
+from prefect.triggers import always_run
 from prefect.engine.result_handlers import LocalResultHandler
-from prefect.environments.storage import Docker
 from prefect.utilities.logging import get_logger
 
-from selenium import webdriver
-from selenium.webdriver.remote.webdriver import WebDriver as RemoteWebDriver
-from selenium.common.exceptions import TimeoutException, InvalidSelectorException, NoSuchElementException, ElementNotVisibleException, InvalidElementStateException
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.by import By
+# selenium and sqlalchemy are only imported within the tasks which need them, so defining the Flow stays cheap
+if T.TYPE_CHECKING:
+    import sqlalchemy as sa
+    from selenium.webdriver.remote.webdriver import WebDriver as RemoteWebDriver
+
+
+def _selenium() -> types.SimpleNamespace:
+    """
+    Import selenium on first use, rather than when the Flow is defined
+    """
+    from selenium import webdriver
+    from selenium.common import exceptions
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.remote.webdriver import WebDriver as RemoteWebDriver
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    return types.SimpleNamespace(
+        webdriver=webdriver,
+        exceptions=exceptions,
+        By=By,
+        RemoteWebDriver=RemoteWebDriver,
+        EC=EC,
+        WebDriverWait=WebDriverWait
+    )
+
+
+#============================
+# Tail latency
+#============================
+# page loads and element waits derive their timeouts from the observed latency. Unlike example-bs4.py, requests
+# aren't hedged, as a duplicate request would need another browser within the memory limit
+# elements rendered by AJAX can lag well behind the page load, so waits are never cut below 10 seconds
+latency_tracker = LatencyTracker(min_timeout=10.)
+circuit_breaker = CircuitBreaker()
 
 
-def click_on_xpath(driver: RemoteWebDriver, xpath: str, timeout: int = 60):
+def load_page(driver: 'RemoteWebDriver', url: str, retries: int = 3):
+    """
+    Navigate to the url, with a page load timeout derived from the observed latency of the host,
+    retrying timeouts and network errors with backoff
+    """
+    exceptions = _selenium().exceptions
+
+    host = urlparse(url).netloc
+    for attempt, delay in enumerate(backoff_delays(retries=retries)):
+        if attempt:
+            time.sleep(delay)
+        circuit_breaker.wait(host)
+        timeout = latency_tracker.timeout('page_load')
+        driver.set_page_load_timeout(timeout)
+        start = time.monotonic()
+        try:
+            driver.get(url=url)
+        except (exceptions.TimeoutException, ) as ex:
+            latency_tracker.record('page_load', timeout)
+            get_logger().warning(f'URL: {url} timed out loading on attempt {attempt + 1} of {retries}')
+            circuit_breaker.failure(host)
+            if attempt + 1 == retries:
+                raise ex
+        except (exceptions.WebDriverException, ) as ex:
+            if browser_governor.killed(driver):
+                # not the host's fault, run_in_browser retries on a fresh browser
+                raise ex
+            get_logger().warning(f'URL: {url} failed with {ex.msg!r} on attempt {attempt + 1} of {retries}')
+            circuit_breaker.failure(host)
+            if attempt + 1 == retries:
+                raise ex
+        else:
+            latency_tracker.record('page_load', time.monotonic() - start)
+            circuit_breaker.success(host)
+            return
+
+
+def click_on_xpath(driver: 'RemoteWebDriver', xpath: str, timeout: T.Optional[float] = None):
+    selenium = _selenium()
+    exceptions = selenium.exceptions
+
     time.sleep(random.uniform(0.5, 1.))
+    timeout = latency_tracker.timeout('wait') if timeout is None else timeout
+    start = time.monotonic()
     try:
-        resolved = WebDriverWait(driver, timeout=timeout).until(
-            EC.element_to_be_clickable((By.XPATH, xpath))
+        resolved = selenium.WebDriverWait(driver, timeout=timeout).until(
+            selenium.EC.element_to_be_clickable((selenium.By.XPATH, xpath))
         )
+        latency_tracker.record('wait', time.monotonic() - start)
         resolved.click()
         return resolved
-    except (TimeoutException, ) as ex:
+    except (exceptions.TimeoutException, ) as ex:
+        latency_tracker.record('wait', timeout)
         get_logger().error(f'Unable to locate element: {xpath} within {timeout} seconds')
         raise ex
-    except (InvalidSelectorException, ) as ex:
+    except (exceptions.InvalidSelectorException, ) as ex:
         raise ex
-    except (NoSuchElementException, ElementNotVisibleException, InvalidElementStateException, ) as ex:
+    except (exceptions.NoSuchElementException, exceptions.ElementNotVisibleException, exceptions.InvalidElementStateException, ) as ex:
         raise ex
 
 
-def wait_on_visible(driver: RemoteWebDriver, xpath: str, timeout: int = 60):
+def wait_on_visible(driver: 'RemoteWebDriver', xpath: str, timeout: T.Optional[float] = None):
+    selenium = _selenium()
+    exceptions = selenium.exceptions
+
+    timeout = latency_tracker.timeout('wait') if timeout is None else timeout
+    start = time.monotonic()
     try:
-        resolved = WebDriverWait(driver, timeout=timeout).until(
-            EC.visibility_of_element_located((By.XPATH, xpath))
+        resolved = selenium.WebDriverWait(driver, timeout=timeout).until(
+            selenium.EC.visibility_of_element_located((selenium.By.XPATH, xpath))
         )
+        latency_tracker.record('wait', time.monotonic() - start)
         return resolved
-    except (TimeoutException, ) as ex:
+    except (exceptions.TimeoutException, ) as ex:
+        latency_tracker.record('wait', timeout)
         get_logger().error(f'URL: {driver.current_url} unable to locate XPATH: {xpath} in timeout: {timeout}')
         raise ex
-    except (InvalidSelectorException, ) as ex:
+    except (exceptions.InvalidSelectorException, ) as ex:
         raise ex
-    except (NoSuchElementException, ElementNotVisibleException, InvalidElementStateException, ) as ex:
+    except (exceptions.NoSuchElementException, exceptions.ElementNotVisibleException, exceptions.InvalidElementStateException, ) as ex:
         get_logger().error(f'URL: {driver.current_url} unable to locate XPATH: {xpath}')
         raise ex
 
 
-def get_element_text(driver: RemoteWebDriver, xpath: str, timeout: int = 60) -> T.Optional[str]:
+def get_element_text(driver: 'RemoteWebDriver', xpath: str, timeout: T.Optional[float] = None) -> T.Optional[str]:
+    exceptions = _selenium().exceptions
+
     try:
         return wait_on_visible(driver=driver, xpath=xpath, timeout=timeout).text
-    except (NoSuchElementException, ElementNotVisibleException, InvalidElementStateException, ) as ex:
+    except (exceptions.NoSuchElementException, exceptions.ElementNotVisibleException, exceptions.InvalidElementStateException, ) as ex:
         return None
 
 
@@ -69,12 +160,15 @@ def get_element_text(driver: RemoteWebDriver, xpath: str, timeout: int = 60) ->
     name="Create DB",
     tags=['db']
 )
-def create_db(filename: T.Union[str, Parameter]) -> sa.Table:
+def create_db(filename: T.Union[str, Parameter]) -> 'sa.Table':
     """
     Specify the Schema of the output table
     """
+    import sqlalchemy as sa
+
     meta = sa.MetaData(
-        bind=sa.create_engine(f"sqlite:///{filename}")
+        # concurrent writers from mapped tasks wait on the SQLite lock, rather than failing immediately
+        bind=sa.create_engine(f"sqlite:///{filename}", connect_args=dict(timeout=30))
     )
     tbl = sa.Table(
         'REVIEWS',
@@ -136,15 +230,19 @@ def create_db(filename: T.Union[str, Parameter]) -> sa.Table:
 
 
 @task
-def insert_data(data: T.Dict[str, T.Any], gaming_platform: str, tbl: T.Union[sa.Table, Result]):
+def insert_data(data: T.Dict[str, T.Any], tbl: T.Union['sa.Table', Result]):
     """
-    Insert the data into the Database
+    Insert the data into the Database, one row per platform the page was listed under
     """
+    data = data.copy()
     data.update(
-        platform=gaming_platform,
         scraped_on=datetime.datetime.utcnow()
     )
-    stmt = tbl.insert().values(data)
+    platforms = data.pop('platforms')
+    stmt = tbl.insert().values([
+        dict(data, platform=_)
+        for _ in platforms
+    ])
     with tbl.bind.begin() as conn:
         rp = conn.execute(stmt)
 
@@ -154,7 +252,9 @@ def insert_data(data: T.Dict[str, T.Any], gaming_platform: str, tbl: T.Union[sa.
 def initialize_browser(
         path_to_chromedriver: T.Union[str, Parameter]
 ):
-    options = webdriver.ChromeOptions()
+    selenium = _selenium()
+
+    options = selenium.webdriver.ChromeOptions()
     # run in 'headless' mode
     options.add_argument('--headless')
     # allow to run as 'root' user
@@ -172,15 +272,370 @@ def initialize_browser(
             'download.default_directory': tempfile.gettempdir()
         }
     )
-    driver = webdriver.Chrome(
+    driver = selenium.webdriver.Chrome(
         executable_path=path_to_chromedriver,
         options=options
     )
-    assert isinstance(driver, RemoteWebDriver)
+    assert isinstance(driver, selenium.RemoteWebDriver)
     # get_logger().info(f"Selenium service_url: {svc.service_url}")
     return driver
 
 
+#============================
+# Browser memory governor
+#============================
+# the K8s job (job_spec.yaml) is limited to 1Gi, and each headless Chrome can take several hundred MB, so
+# concurrent browser sessions are admitted from the measured memory headroom of the container, and a watchdog
+# kills runaway renderer processes before the kernel OOM-kills the whole job
+CGROUP_V2_ROOT = Path('/sys/fs/cgroup')
+CGROUP_V1_MEMORY = Path('/sys/fs/cgroup/memory')
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+MB = 1024 * 1024
+
+
+def _read_int(path: Path) -> T.Optional[int]:
+    try:
+        value = path.read_text().strip()
+    except (OSError, ) as ex:
+        return None
+    if value == 'max':
+        return None
+    try:
+        return int(value)
+    except ValueError as ex:
+        return None
+
+
+def _read_memory_stat(path: Path, key: str) -> int:
+    try:
+        for line in path.read_text().splitlines():
+            name, _, value = line.partition(' ')
+            if name == key:
+                return int(value)
+    except (OSError, ValueError, ) as ex:
+        pass
+    return 0
+
+
+def read_container_memory() -> T.Tuple[int, T.Optional[int]]:
+    """
+    Return the (working set, limit) of the container in bytes, from the cgroup v2 or v1 memory controller.
+
+    The working set excludes inactive page cache, which is what the kubelet and OOM-killer act upon.
+    The limit is None when the container is unbounded.
+    """
+    if (CGROUP_V2_ROOT / 'memory.current').exists():
+        usage = _read_int(CGROUP_V2_ROOT / 'memory.current') or 0
+        limit = _read_int(CGROUP_V2_ROOT / 'memory.max')
+        inactive = _read_memory_stat(CGROUP_V2_ROOT / 'memory.stat', 'inactive_file')
+    else:
+        usage = _read_int(CGROUP_V1_MEMORY / 'memory.usage_in_bytes') or 0
+        limit = _read_int(CGROUP_V1_MEMORY / 'memory.limit_in_bytes')
+        inactive = _read_memory_stat(CGROUP_V1_MEMORY / 'memory.stat', 'total_inactive_file')
+        # cgroup v1 reports an 'unlimited' container as a huge page-aligned number
+        if limit is not None and limit >= 2 ** 60:
+            limit = None
+    return max(usage - inactive, 0), limit
+
+
+def _process_rss(pid: int) -> int:
+    try:
+        return int(Path(f'/proc/{pid}/statm').read_text().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError, ) as ex:
+        return 0
+
+
+def _process_pss(pid: int) -> int:
+    """
+    Proportional set size of the process, which splits the pages Chrome processes share (i.e. the binary and the
+    zygote-forked memory) between them, so the sizes of a process tree can be summed
+    """
+    try:
+        for line in Path(f'/proc/{pid}/smaps_rollup').read_text().splitlines():
+            if line.startswith('Pss:'):
+                return int(line.split()[1]) * 1024
+    except (OSError, IndexError, ValueError, ) as ex:
+        pass
+    return 0
+
+
+def _process_cmdline(pid: int) -> str:
+    try:
+        return Path(f'/proc/{pid}/cmdline').read_bytes().replace(b'\x00', b' ').decode(errors='replace')
+    except (OSError, ) as ex:
+        return ''
+
+
+def _process_children() -> T.Dict[int, T.List[int]]:
+    children = dict()
+    for entry in Path('/proc').iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            # the command name may contain spaces, so split after the closing parenthesis
+            ppid = int((entry / 'stat').read_text().rpartition(')')[2].split()[1])
+        except (OSError, IndexError, ValueError, ) as ex:
+            continue
+        children.setdefault(ppid, list()).append(int(entry.name))
+    return children
+
+
+def process_tree(pid: int, children: T.Optional[T.Dict[int, T.List[int]]] = None) -> T.List[int]:
+    """
+    Return the pid and all of its descendants (i.e. chromedriver, Chrome and its renderers)
+    """
+    children = _process_children() if children is None else children
+    tree, stack = list(), [pid]
+    while stack:
+        current = stack.pop()
+        tree.append(current)
+        stack.extend(children.get(current, list()))
+    return tree
+
+
+class BrowserSession(object):
+    """
+    A governed Chrome session, which can be replaced when the watchdog kills one of its renderers
+    """
+
+    def __init__(self, governor: 'BrowserGovernor', path_to_chromedriver: str):
+        self.governor = governor
+        self.path_to_chromedriver = path_to_chromedriver
+        self.driver = None
+        self.pss = 0
+        self.killed = False
+
+    @property
+    def pid(self) -> T.Optional[int]:
+        try:
+            return self.driver.service.process.pid
+        except AttributeError as ex:
+            return None
+
+    def start(self):
+        self.driver = initialize_browser(path_to_chromedriver=self.path_to_chromedriver)
+        self.pss = 0
+        self.killed = False
+
+    def stop(self):
+        exceptions = _selenium().exceptions
+
+        if self.driver is not None:
+            try:
+                # quit (rather than close) so chromedriver and every Chrome process releases its memory
+                self.driver.quit()
+            except (exceptions.WebDriverException, OSError, ) as ex:
+                get_logger().warning(f'Unable to cleanly quit browser: {ex}')
+            self.driver = None
+
+    def restart(self):
+        get_logger().warning('Replacing browser session after its renderer was killed')
+        self.stop()
+        self.start()
+
+
+class BrowserGovernor(RuntimeStateMixin):
+    """
+    Admit concurrent browser sessions based on the memory headroom of the container,
+    and kill runaway Chrome renderers before the kernel OOM-kills the whole job.
+
+    Finished sessions are kept as an idle pool, so later tasks skip the browser startup.
+
+    :param max_sessions: upper bound of concurrent browser sessions, regardless of headroom
+    :param session_estimate: minimum estimate of the memory (bytes) of one browser session,
+        raised to the 90th percentile of the healthy sessions recently observed by the watchdog
+    :param high_water: fraction of the container limit the working set should stay below
+    :param renderer_limit: memory (bytes) a single renderer may use before it's killed
+    :param interval: seconds between watchdog samples
+    """
+    _runtime_attributes = ('_cond', '_sessions', '_idle', '_pss_samples', '_watchdog', )
+
+    def __init__(
+            self,
+            max_sessions: int = 4,
+            session_estimate: int = 300 * MB,
+            high_water: float = 0.85,
+            renderer_limit: int = 512 * MB,
+            interval: float = 2.
+    ):
+        self.max_sessions = max_sessions
+        self.min_session_estimate = session_estimate
+        self.session_estimate = session_estimate
+        self.high_water = high_water
+        self.renderer_limit = renderer_limit
+        self.interval = interval
+        self._init_state()
+
+    def _init_state(self):
+        self._cond = threading.Condition()
+        self._sessions = list()
+        self._idle = list()
+        self._pss_samples = collections.deque(maxlen=50)
+        self._watchdog = None
+
+    def killed(self, driver: 'RemoteWebDriver') -> bool:
+        """
+        Whether the watchdog killed a renderer of the session the driver belongs to
+        """
+        with self._cond:
+            return any(_.killed for _ in self._sessions if _.driver is driver)
+
+    def allowed_sessions(self) -> int:
+        """
+        Number of concurrent sessions the current memory headroom can hold
+        """
+        working_set, limit = read_container_memory()
+        active = len(self._sessions)
+        if limit is None:
+            return self.max_sessions
+        # sessions still starting up haven't grown to their full size yet, so reserve the difference
+        reserved = sum(max(self.session_estimate - _.pss, 0) for _ in self._sessions)
+        headroom = limit * self.high_water - working_set - reserved
+        allowed = active + max(int(headroom // self.session_estimate), 0)
+        # always allow a single session, otherwise the flow would never progress
+        return max(min(allowed, self.max_sessions), 1)
+
+    @contextlib.contextmanager
+    def session(self, path_to_chromedriver: str) -> T.Iterator[BrowserSession]:
+        """
+        Yield an idle browser from the pool, or block until there's enough memory headroom to start another
+        """
+        with self._cond:
+            while not self._idle and len(self._sessions) >= self.allowed_sessions():
+                self._cond.wait(timeout=self.interval)
+            if self._idle:
+                session = self._idle.pop()
+            else:
+                # hold the slot while the browser starts, so concurrent tasks account for it
+                session = BrowserSession(governor=self, path_to_chromedriver=path_to_chromedriver)
+                self._sessions.append(session)
+            self._ensure_watchdog()
+        healthy = False
+        try:
+            if session.driver is None:
+                session.start()
+            elif session.killed:
+                session.restart()
+            yield session
+            healthy = not session.killed
+        finally:
+            self.release(session, healthy=healthy)
+
+    def release(self, session: BrowserSession, healthy: bool = True):
+        """
+        Return a session to the pool for the next task, unless it's broken or memory is running short
+        """
+        exceptions = _selenium().exceptions
+
+        if healthy:
+            try:
+                # drop the previous page, so an idle browser holds as little memory as possible
+                session.driver.get('about:blank')
+            except (exceptions.WebDriverException, ) as ex:
+                healthy = False
+        with self._cond:
+            if healthy and len(self._sessions) <= self.allowed_sessions():
+                self._idle.append(session)
+                session = None
+            else:
+                self._sessions.remove(session)
+            self._cond.notify_all()
+        if session is not None:
+            session.stop()
+
+    def close(self):
+        """
+        Quit every idle browser in the pool
+        """
+        with self._cond:
+            idle, self._idle = self._idle, list()
+            for session in idle:
+                self._sessions.remove(session)
+            self._cond.notify_all()
+        for session in idle:
+            session.stop()
+
+    def _ensure_watchdog(self):
+        if self._watchdog is None or not self._watchdog.is_alive():
+            atexit.register(self.close)
+            self._watchdog = threading.Thread(target=self._watch, name='browser-watchdog', daemon=True)
+            self._watchdog.start()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.sample()
+            except Exception as ex:
+                get_logger().warning(f'Browser watchdog failed to sample memory: {ex}')
+
+    def sample(self):
+        """
+        Measure every session, and kill the renderer which puts the container at risk of an OOM-kill
+        """
+        with self._cond:
+            sessions = [_ for _ in self._sessions if _.pid is not None]
+        if not sessions:
+            return
+
+        children = _process_children()
+        renderers = list()
+        for session in sessions:
+            tree = process_tree(session.pid, children=children)
+            session.pss = sum(_process_pss(_) for _ in tree)
+            renderers += [
+                (_process_rss(_), _, session)
+                for _ in tree
+                if '--type=renderer' in _process_cmdline(_)
+            ]
+
+        working_set, limit = read_container_memory()
+        runaway = [_ for _ in renderers if _[0] > self.renderer_limit]
+        if not runaway and limit is not None and working_set > limit * self.high_water and renderers:
+            runaway = [max(renderers, key=lambda _: _[0])]
+
+        # a runaway session would hold the estimate up, and serialize the rest of the run
+        excluded = set(id(_[2]) for _ in runaway)
+        self._pss_samples.extend(_.pss for _ in sessions if not _.killed and id(_) not in excluded)
+        if self._pss_samples:
+            samples = sorted(self._pss_samples)
+            self.session_estimate = max(self.min_session_estimate, samples[int(0.9 * (len(samples) - 1))])
+
+        for rss, pid, session in runaway:
+            get_logger().warning(
+                f'Killing Chrome renderer {pid} using {rss // MB}MB '
+                f'(container at {working_set // MB}MB of {limit // MB if limit else "unlimited "}MB)'
+            )
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except (OSError, ) as ex:
+                continue
+            session.killed = True
+
+        with self._cond:
+            self._cond.notify_all()
+
+
+browser_governor = BrowserGovernor()
+
+
+def run_in_browser(func: T.Callable, path_to_chromedriver: str, **kwargs) -> T.Any:
+    """
+    Call func with a governed browser as its driver, and if the watchdog kills one of its renderers,
+    try once more on a fresh browser
+    """
+    exceptions = _selenium().exceptions
+
+    with browser_governor.session(path_to_chromedriver=path_to_chromedriver) as session:
+        try:
+            return func(driver=session.driver, **kwargs)
+        except (exceptions.WebDriverException, ) as ex:
+            if not session.killed:
+                raise ex
+        session.restart()
+        return func(driver=session.driver, **kwargs)
+
+
 @task(
     # max_retries=3,
     # retry_delay=datetime.timedelta(minutes=5),
@@ -190,11 +645,23 @@ def initialize_browser(
 def task_locate_links_on_home_page(
         url: T.Union[str, Parameter],
         gaming_platform: T.Union[str, Parameter],
-        path_to_chromedriver: T.Union[str, Parameter]
+        path_to_chromedriver: T.Union[str, Parameter],
+        max_browsers: T.Union[int, Parameter] = 4
 ) -> T.Union[T.List[str], Result]:
-    driver = initialize_browser(path_to_chromedriver=path_to_chromedriver)
+    browser_governor.max_sessions = max_browsers
+    return run_in_browser(
+        locate_links_on_home_page,
+        path_to_chromedriver=path_to_chromedriver,
+        url=url,
+        gaming_platform=gaming_platform
+    )
+
+
+def locate_links_on_home_page(driver: 'RemoteWebDriver', url: str, gaming_platform: str) -> T.List[str]:
+    exceptions = _selenium().exceptions
+
     # download the HTML from the site
-    driver.get(url=url)
+    load_page(driver=driver, url=url)
 
     get_logger().info('navigate to "Games"')
     resolved = click_on_xpath(
@@ -242,43 +709,59 @@ def task_locate_links_on_home_page(
     # get links from other pages
     next_page = '//li[contains(@class, "active_page")]//parent::li//following-sibling::li/a'
     while True:
+        # only a missing "next" link ends the pagination, a page whose titles never render fails the task
         try:
             click_on_xpath(
                 driver=driver,
                 xpath=next_page,
                 timeout=5
             )
-            links += get_all_links(_driver=driver)
-            get_logger().info(f"running total of links: {len(links)}")
-        except (TimeoutException, NoSuchElementException, ):
+        except (exceptions.TimeoutException, exceptions.NoSuchElementException, ):
             get_logger().info(f"finished iterating through all pages")
             break
+        links += get_all_links(_driver=driver)
+        get_logger().info(f"running total of links: {len(links)}")
 
-    driver.close()
     get_logger().info(f"Discovered {len(links)} links to follow")
     return links
 
 
 @task
 def task_filter_links(
-        links: T.Union[T.List[str], Result],
-        gaming_platform: T.Union[str, Parameter],
-        tbl: T.Union[sa.Table, Result]
-) -> T.Union[T.List[str], Result]:
+        links: T.Union[T.List[T.List[str]], Result],
+        gaming_platforms: T.Union[T.List[str], Parameter],
+        tbl: T.Union['sa.Table', Result]
+) -> T.Union[T.List[T.Tuple[str, T.List[str]]], Result]:
     """
-    Remove any links which we have 'recently' scraped
+    Merge the links discovered for each platform into one work queue of (url, platforms), so a title listed
+    under several platforms is only scraped once, without any links which we have 'recently' scraped
     """
+    import sqlalchemy as sa
+
+    # the catalog pages can list a title more than once, so keep each url once, with every platform it's listed under
+    queue = dict()
+    for gaming_platform, platform_links in zip(gaming_platforms, links):
+        for link in platform_links:
+            platforms = queue.setdefault(link, list())
+            if gaming_platform not in platforms:
+                platforms.append(gaming_platform)
+
     stmt = sa.select([
-        tbl.c.source_url
+        tbl.c.source_url,
+        tbl.c.platform
     ]).where(sa.and_(
-        tbl.c.platform == gaming_platform,
-        tbl.c.source_url.in_(links),
+        tbl.c.platform.in_(gaming_platforms),
+        tbl.c.source_url.in_(list(queue)),
         # tbl.c.scraped_on > datetime.datetime.utcnow() - datetime.timedelta(days=1)
     ))
     rp = tbl.bind.execute(stmt)
-    results = set([_[0] for _ in rp.fetchall()])
-    output = list(set(links).difference(results))
-    get_logger().info(f'Discovered {len(output)} links to parse')
+    results = set([tuple(_) for _ in rp.fetchall()])
+    output = [
+        (url, [_ for _ in platforms if (url, _) not in results])
+        for url, platforms in queue.items()
+    ]
+    output = [_ for _ in output if _[1]]
+    get_logger().info(f'Discovered {len(output)} links to parse across {len(gaming_platforms)} platforms')
     return output
 
 
@@ -289,11 +772,38 @@ def task_filter_links(
     # cache_validator=cache_validators.all_inputs
 )
 def task_extract_data_from_game_page(
-        url: T.Union[str, Parameter],
-        path_to_chromedriver: T.Union[str, Parameter]
+        link: T.Union[T.Tuple[str, T.List[str]], Result],
+        path_to_chromedriver: T.Union[str, Parameter],
+        max_browsers: T.Union[int, Parameter] = 4
 ) -> T.Union[T.Dict[str, T.Any], Result]:
-    driver = initialize_browser(path_to_chromedriver=path_to_chromedriver)
-    driver.get(url=url)
+    url, gaming_platforms = link
+    browser_governor.max_sessions = max_browsers
+    data = run_in_browser(
+        extract_data_from_game_page,
+        path_to_chromedriver=path_to_chromedriver,
+        url=url
+    )
+    # insert_data writes a row per platform, so the platform column holds a single value
+    data.update(
+        platforms=gaming_platforms
+    )
+    return data
+
+
+@task(
+    trigger=always_run
+)
+def task_close_browsers():
+    """
+    Quit the idle browsers left in the pool once every page is scraped
+    """
+    browser_governor.close()
+
+
+def extract_data_from_game_page(driver: 'RemoteWebDriver', url: str) -> T.Dict[str, T.Any]:
+    exceptions = _selenium().exceptions
+
+    load_page(driver=driver, url=url)
     try:
         metascore = float(get_element_text(driver=driver, xpath='//div[contains(@class, "metascore_w")]/span'))
     except ValueError as ex:
@@ -325,7 +835,7 @@ def task_extract_data_from_game_page(
             driver=driver,
             xpath='//div[contains(@class, "product_data")]//li[contains(@class, "publisher")]/span[contains(@class, "data")]'
         )
-    except (NoSuchElementException, ) as ex:
+    except (exceptions.NoSuchElementException, ) as ex:
         publisher = None
 
     try:
@@ -333,12 +843,12 @@ def task_extract_data_from_game_page(
             driver=driver,
             xpath='//div[contains(@class, "product_details")]//li[contains(@class, "developer")]/span[contains(@class, "data")]'
         )
-    except (NoSuchElementException, ) as ex:
+    except (exceptions.NoSuchElementException, ) as ex:
         developer = None
 
     try:
         genres = '|'.join([_.text for _ in driver.find_elements_by_xpath('//div[contains(@class, "product_details")]//li[contains(@class, "product_genre")]/span[contains(@class, "data")]')])
-    except (NoSuchElementException, ) as ex:
+    except (exceptions.NoSuchElementException, ) as ex:
         genres = None
 
 
@@ -347,7 +857,7 @@ def task_extract_data_from_game_page(
             driver=driver,
             xpath='//div[contains(@class, "product_details")]//li[contains(@class, "product_rating")]/span[contains(@class, "data")]'
         )
-    except (NoSuchElementException, ) as ex:
+    except (exceptions.NoSuchElementException, ) as ex:
         rating = None
 
     try:
@@ -358,8 +868,6 @@ def task_extract_data_from_game_page(
     except ValueError as ex:
         release_date = None
 
-    driver.close()
-
     data = dict(
         metascore=metascore,
         crit_reviews=crit_reviews,
@@ -375,6 +883,39 @@ def task_extract_data_from_game_page(
     return data
 
 
+def configure_deployment(flow: Flow) -> Flow:
+    """
+    Attach the environment and storage, which are only needed to register the Flow on Prefect Cloud
+    """
+    from prefect.environments import KubernetesJobEnvironment
+    from prefect.environments.storage import Docker
+
+    # TODO: specify the environment you want to execute the Flow in (from Prefect Cloud)
+    flow.environment = KubernetesJobEnvironment(
+        job_spec_file='job_spec.yaml',
+    )
+    flow.storage = Docker(
+        # TODO: change to your docker registry:
+        #  https://docs.prefect.io/cloud/recipes/configuring_storage.html
+        registry_url='szelenka',
+        # TODO: need to specify a base Docker image which has the chromedriver dependencies already installed
+        base_image='szelenka/python-selenium-chromium:3.7.4',
+        # TODO: 'pin' the exact versions you used on your development machine
+        python_dependencies=[
+            'selenium==3.141.0',
+            'sqlalchemy==1.3.15'
+        ],
+        # ship the helpers shared by the example Flows
+        files={
+            Path(__file__).with_name('webscraper_utils.py').absolute().as_posix(): '/modules/webscraper_utils.py'
+        },
+        env_vars={
+            'PYTHONPATH': '$PYTHONPATH:/modules/'
+        },
+    )
+    return flow
+
+
 with Flow(
         name="example-selenium",
         schedule=Schedule(
@@ -385,27 +926,11 @@ with Flow(
                     cron='0 0 * * *',
                     parameter_defaults=dict(
                         home_page='https://www.metacritic.com/',
-                        gaming_platform='Switch'
+                        gaming_platforms=['Switch', 'PS4', 'Xbox One', 'PC']
                     )
                 ),
             ]
         ),
-        # TODO: specify the environment you want to execute the Flow in (from Prefect Cloud)
-        environment=KubernetesJobEnvironment(
-            job_spec_file='job_spec.yaml',
-        ),
-        storage=Docker(
-            # TODO: change to your docker registry:
-            #  https://docs.prefect.io/cloud/recipes/configuring_storage.html
-            registry_url='szelenka',
-            # TODO: need to specify a base Docker image which has the chromedriver dependencies already installed
-            base_image='szelenka/python-selenium-chromium:3.7.4',
-            # TODO: 'pin' the exact versions you used on your development machine
-            python_dependencies=[
-                'selenium==3.141.0',
-                'sqlalchemy==1.3.15'
-            ],
-        ),
         # TODO: specify how you want to handle results
         #  https://docs.prefect.io/core/concepts/results.html#results-and-result-handlers
         result_handler=LocalResultHandler()
@@ -413,40 +938,54 @@ with Flow(
     # specify the DAG input parameters
     _path_to_chromedriver = Parameter('path_to_chromedriver', default='/usr/bin/chromedriver')
     _home_page_url = Parameter('home_page', default='https://www.metacritic.com/')
-    _gaming_platform = Parameter('gaming_platform', default='Switch')
+    _gaming_platforms = Parameter('gaming_platforms', default=['Switch'])
     _db_file = Parameter("db_file", default='game_reviews.sqlite', required=False)
+    _max_browsers = Parameter("max_browsers", default=4, required=False)
 
     # specify function flow for DAG
 
-    # extract links of pages to parse
-    links_from_home_page = task_locate_links_on_home_page(
-        url=_home_page_url,
-        gaming_platform=_gaming_platform,
-        path_to_chromedriver=_path_to_chromedriver
+    # extract links of pages to parse, discovering each platform concurrently
+    links_from_home_page = task_locate_links_on_home_page.map(
+        url=unmapped(_home_page_url),
+        gaming_platform=_gaming_platforms,
+        path_to_chromedriver=unmapped(_path_to_chromedriver),
+        max_browsers=unmapped(_max_browsers)
     )
 
     _db = create_db(
         filename=_db_file
     )
     _filtered_links = task_filter_links(
-        gaming_platform=_gaming_platform,
+        gaming_platforms=_gaming_platforms,
         links=links_from_home_page,
         tbl=_db,
     )
 
     # parse data off the pages
     _raw_data = task_extract_data_from_game_page.map(
-        url=_filtered_links,
-        path_to_chromedriver=unmapped(_path_to_chromedriver)
+        link=_filtered_links,
+        path_to_chromedriver=unmapped(_path_to_chromedriver),
+        max_browsers=unmapped(_max_browsers)
     )
 
     # insert into SQLite table
     _final = insert_data.map(
         data=_raw_data,
-        gaming_platform=unmapped(_gaming_platform),
         tbl=unmapped(_db)
     )
 
+    # release the shared browser pool
+    _closed = task_close_browsers(
+        upstream_tasks=[_final]
+    )
+
+    # the cleanup always runs, so the Flow state should reflect the scraping itself
+    flow.set_reference_tasks([_final])
+
+# report the time to the first task, when PROFILE_STARTUP is set
+for _task in flow.tasks:
+    _task.state_handlers.append(profile_startup)
+
 
 if __name__ == '__main__':
 
@@ -454,6 +993,7 @@ if __name__ == '__main__':
     import sys
     import argparse
     from prefect.utilities.debug import raise_on_exception
+    from prefect.engine.executors import LocalDaskExecutor
 
     # get any CLI arguments
     parser = argparse.ArgumentParser()
@@ -470,7 +1010,7 @@ if __name__ == '__main__':
         if p.deploy:
             # TODO: hack for https://github.com/PrefectHQ/prefect/issues/2165
             flow.result_handler.dir = '/root/.prefect/results'
-            flow.register(
+            configure_deployment(flow).register(
                 # TODO: specify the project_name on Prefect Cloud you're authenticated to
                 project_name="Cisco",
                 build=True,
@@ -484,5 +1024,7 @@ if __name__ == '__main__':
                 parameters=dict(
                     path_to_chromedriver=Path('./chromedriver').absolute().as_posix()
                 ),
-                run_on_schedule=False
+                run_on_schedule=False,
+                # mapped tasks run on threads, so they share the browser_governor
+                executor=LocalDaskExecutor(scheduler='threads')
             )
@@ -0,0 +1,290 @@
+"""
+Helpers shared by the example Flows.
+
+Only the standard library is imported here, as the Flows import this module before anything else.
+
+Flows registered from a script are pickled by value, but anything imported from this module is pickled by reference,
+so it's shipped alongside the Flow in the Docker storage (see `configure_deployment` in each example).
+"""
+import typing as T
+import builtins
+import collections
+import importlib.util
+import os
+from pathlib import Path
+import random
+import sys
+import threading
+import time
+
+if T.TYPE_CHECKING:
+    from prefect import Task
+    from prefect.engine.state import State
+
+
+#============================
+# Startup profiling
+#============================
+# set PROFILE_STARTUP=1 to report the import time per module, and the time from process start to the first task.
+# each Flow imports this module before Prefect, so the hook also measures Prefect itself, and the imports which
+# the tasks defer until they run are reported as each task finishes
+PROFILE_MIN_SECONDS = 0.01
+_import_times = dict()
+_reported_imports = set()
+_report_lock = threading.Lock()
+_startup_reported = threading.Event()
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0, _import=builtins.__import__):
+    if not level and not fromlist and name in sys.modules:
+        return _import(name, globals, locals, fromlist, level)
+    try:
+        resolved = importlib.util.resolve_name('.' * level + name, (globals or dict()).get('__package__'))
+    except (ImportError, ValueError, ) as ex:
+        return _import(name, globals, locals, fromlist, level)
+    before = set(sys.modules)
+    start = time.perf_counter()
+    # an import which raises isn't recorded, e.g. an optional dependency which isn't installed
+    module = _import(name, globals, locals, fromlist, level)
+    seconds = time.perf_counter() - start
+    # only modules this statement asked for, and which weren't already loaded; the names in fromlist may be
+    # attributes rather than submodules, and other threads may load unrelated modules meanwhile
+    parts = resolved.split('.')
+    requested = ['.'.join(parts[:_]) for _ in range(1, len(parts) + 1)]
+    requested += [f'{resolved}.{_}' for _ in fromlist or () if _ != '*']
+    loaded = set(sys.modules).difference(before)
+    for key in requested:
+        # nested imports record their own modules first, so the time of each module includes the modules it imports
+        if key in loaded and key not in _import_times:
+            _import_times[key] = seconds
+    return module
+
+
+if os.environ.get('PROFILE_STARTUP') and builtins.__import__.__name__ != _timed_import.__name__:
+    builtins.__import__ = _timed_import
+
+
+def process_age() -> float:
+    """
+    Seconds since the current process started, i.e. since the worker pod launched the Flow
+    """
+    uptime = float(Path('/proc/uptime').read_text().split()[0])
+    # the command name may contain spaces, so split after the closing parenthesis; 'starttime' is field 22
+    started = int(Path('/proc/self/stat').read_text().rpartition(')')[2].split()[19])
+    return uptime - started / os.sysconf('SC_CLK_TCK')
+
+
+def _report_imports(logger, prefix: str):
+    with _report_lock:
+        pending = [_ for _ in list(_import_times.items()) if _[0] not in _reported_imports]
+        _reported_imports.update(_[0] for _ in pending)
+    shown = [_ for _ in pending if _[1] >= PROFILE_MIN_SECONDS]
+    for name, seconds in sorted(shown, key=lambda _: -_[1]):
+        logger.info(f'{prefix} import {name} took {seconds:.3f} seconds')
+    if len(pending) > len(shown):
+        logger.info(f'{prefix} {len(pending) - len(shown)} other modules took under {PROFILE_MIN_SECONDS} seconds each')
+
+
+def profile_startup(task: 'Task', old_state: 'State', new_state: 'State') -> 'State':
+    """
+    State handler which reports the import time per module and the time to the first task, when PROFILE_STARTUP is set
+    """
+    if not os.environ.get('PROFILE_STARTUP'):
+        return new_state
+    from prefect.utilities.logging import get_logger
+
+    logger = get_logger()
+    if new_state.is_running():
+        with _report_lock:
+            if _startup_reported.is_set():
+                return new_state
+            _startup_reported.set()
+        try:
+            logger.info(f'Startup: {process_age():.2f} seconds from process start to first task "{task.name}"')
+        except (OSError, IndexError, ValueError, ) as ex:
+            logger.warning(f'Startup: unable to determine the process age: {ex}')
+        if not _import_times:
+            logger.info('Startup: no import times recorded, set PYTHONPROFILEIMPORTTIME=1 to have Python report them')
+        _report_imports(logger, prefix='Startup:')
+    elif new_state.is_finished():
+        # modules imported since the last report, e.g. selenium on the first browser session; with
+        # a threaded executor they're attributed to whichever task finishes first
+        _report_imports(logger, prefix=f'Task "{task.name}":')
+    return new_state
+
+
+#============================
+# Shared state
+#============================
+class RuntimeStateMixin(object):
+    """
+    Keep only the configuration when pickled into the Flow storage, as locks and threads can't be pickled.
+
+    Subclasses name their runtime-only attributes in `_runtime_attributes`, and create them in `_init_state`,
+    which is called again when unpickled.
+    """
+    _runtime_attributes = tuple()
+
+    def _init_state(self):
+        raise NotImplementedError
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for key in self._runtime_attributes:
+            state.pop(key, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_state()
+
+
+#============================
+# Tail latency
+#============================
+# a single hung page shouldn't set the length of the run, so timeouts are derived from the observed latency,
+# failed requests are retried with jittered backoff, and hosts which keep failing are given time to recover
+class LatencyTracker(RuntimeStateMixin):
+    """
+    Track a rolling window of latencies per stage, to derive timeouts and hedging delays from.
+
+    :param window: number of recent samples kept per stage
+    :param min_samples: samples required before the observed distribution is trusted
+    :param default_timeout: timeout (seconds) used until enough samples are observed
+    :param min_timeout: lower bound of the derived timeout
+    :param max_timeout: upper bound of the derived timeout
+    :param multiplier: factor applied to the p99 latency to derive the timeout
+    :param min_hedge_delay: lower bound of the hedging delay, so a fast host isn't sent every request twice
+    :param hedge_budget: fraction of the requests of a stage which may be hedged
+    """
+    _runtime_attributes = ('_lock', '_samples', '_requests', '_hedges', )
+
+    def __init__(
+            self,
+            window: int = 200,
+            min_samples: int = 10,
+            default_timeout: float = 30.,
+            min_timeout: float = 2.,
+            max_timeout: float = 60.,
+            multiplier: float = 3.,
+            min_hedge_delay: float = 0.1,
+            hedge_budget: float = 0.1
+    ):
+        self.window = window
+        self.min_samples = min_samples
+        self.default_timeout = default_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.multiplier = multiplier
+        self.min_hedge_delay = min_hedge_delay
+        self.hedge_budget = hedge_budget
+        self._init_state()
+
+    def _init_state(self):
+        self._lock = threading.Lock()
+        self._samples = dict()
+        self._requests = collections.Counter()
+        self._hedges = collections.Counter()
+
+    def record(self, stage: str, seconds: float):
+        """
+        Record the latency of a request; a timed out request is recorded at its timeout,
+        so the derived timeout can widen again after a slowdown
+        """
+        with self._lock:
+            self._samples.setdefault(stage, collections.deque(maxlen=self.window)).append(seconds)
+            self._requests[stage] += 1
+
+    def percentile(self, stage: str, q: float) -> T.Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples.get(stage, list()))
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(int(q * len(samples)), len(samples) - 1)]
+
+    def timeout(self, stage: str) -> float:
+        p99 = self.percentile(stage, 0.99)
+        if p99 is None:
+            return self.default_timeout
+        return min(max(p99 * self.multiplier, self.min_timeout), self.max_timeout)
+
+    def hedge_delay(self, stage: str) -> T.Optional[float]:
+        p95 = self.percentile(stage, 0.95)
+        if p95 is None:
+            return None
+        return max(p95, self.min_hedge_delay)
+
+    def claim_hedge(self, stage: str) -> bool:
+        """
+        Claim a hedged request, unless hedges already make up hedge_budget of the requests of the stage,
+        so a slowdown of the whole host doesn't double the load on it
+        """
+        with self._lock:
+            if self._hedges[stage] + 1 > self.hedge_budget * self._requests[stage]:
+                return False
+            self._hedges[stage] += 1
+            return True
+
+
+class CircuitBreaker(RuntimeStateMixin):
+    """
+    Hold back requests to a host after consecutive failures, until it has had time to recover.
+
+    :param failure_threshold: consecutive failures which open the circuit for a host
+    :param reset_timeout: seconds the circuit stays open, before a single trial request is let through
+    """
+    _runtime_attributes = ('_cond', '_failures', '_opened_at', '_trials', )
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._init_state()
+
+    def _init_state(self):
+        self._cond = threading.Condition()
+        self._failures = dict()
+        self._opened_at = dict()
+        self._trials = dict()
+
+    def wait(self, host: str):
+        """
+        Block while the circuit for the host is open, rather than dropping the request,
+        then let a single trial request through once the host has had time to recover
+        """
+        with self._cond:
+            while True:
+                opened_at = self._opened_at.get(host)
+                if opened_at is None:
+                    return
+                now = time.monotonic()
+                remaining = self.reset_timeout - (now - opened_at)
+                # a trial which never reported back doesn't hold the host forever
+                trial_at = self._trials.get(host)
+                if remaining <= 0 and (trial_at is None or now - trial_at > self.reset_timeout):
+                    self._trials[host] = now
+                    return
+                self._cond.wait(timeout=remaining if remaining > 0 else self.reset_timeout)
+
+    def success(self, host: str):
+        with self._cond:
+            self._failures.pop(host, None)
+            self._opened_at.pop(host, None)
+            self._trials.pop(host, None)
+            self._cond.notify_all()
+
+    def failure(self, host: str):
+        with self._cond:
+            self._failures[host] = self._failures.get(host, 0) + 1
+            self._trials.pop(host, None)
+            if self._failures[host] >= self.failure_threshold:
+                # a failed trial re-opens the circuit for another reset_timeout
+                self._opened_at[host] = time.monotonic()
+            self._cond.notify_all()
+
+
+def backoff_delays(retries: int, base: float = 0.5, cap: float = 10.) -> T.Iterator[float]:
+    """
+    Exponential backoff with 'full jitter', so retries of many mapped tasks don't arrive in lockstep
+    """
+    for attempt in range(retries):
+        yield random.uniform(0, min(cap, base * 2 ** attempt))